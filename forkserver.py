@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""Pre-warmed fork server for hosted Python scripts.
+
+Started by bot.py when FORKSERVER=1. It imports the libraries hosted bots commonly
+use once, then forks one child per script, so a start skips interpreter startup and
+heavy imports, and all children share the already-imported read-only pages.
+
+Protocol (UNIX stream socket, one request per connection):
+  client -> server: one JSON line {"script", "cwd", "argv", "new_session", "site_dirs"} sent with
+                    SCM_RIGHTS carrying the child's stdin, stdout and stderr fds
+  server -> client: {"pid": <pid>}   as soon as the child is forked
+                    {"exit": <code>} when the child exits (negative = killed by signal)
+"""
+import os
+import sys
+import json
+import socket
+import signal
+import selectors
+import runpy
+import site
+import importlib
+import logging
+import traceback
+
+logging.basicConfig(level=logging.INFO,
+                    format='%(asctime)s - forkserver - %(levelname)s - %(message)s')
+logger = logging.getLogger('forkserver')
+
+
+def preload_modules(module_names):
+    for module_name in module_names:
+        try: importlib.import_module(module_name)
+        except Exception as e: logger.warning(f"Preload of '{module_name}' failed: {e}")
+    logger.info(f"Preloaded {len(module_names)} modules.")
+
+
+def run_child(request, fds, close_fds):
+    """Runs in the forked child: take over the script's fds, cwd and argv, then execute it as __main__."""
+    signal.set_wakeup_fd(-1)
+    signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+    for fd in close_fds:
+        try: os.close(fd)
+        except OSError: pass
+    if request.get('new_session'): os.setsid()
+    for target_fd, fd in enumerate(fds): os.dup2(fd, target_fd)
+    for fd in set(fds):
+        if fd > 2: os.close(fd)
+    os.chdir(request['cwd'])
+    script_path = request['script']
+    sys.argv = request['argv']
+    sys.path[0] = os.path.dirname(os.path.abspath(script_path))
+    for site_dir in reversed(request.get('site_dirs') or []): # The owner's venv shadows the host's packages
+        host_path = list(sys.path)
+        site.addsitedir(site_dir) # Also processes .pth files
+        added = [p for p in sys.path if p not in host_path]
+        sys.path[:] = host_path[:1] + added + host_path[1:]
+    try:
+        runpy.run_path(script_path, run_name='__main__')
+    except SystemExit: raise # Normal interpreter exit: atexit handlers and non-daemon threads still run
+    except BaseException:
+        traceback.print_exc()
+        sys.exit(1)
+    sys.exit(0)
+
+
+def handle_request(conn, children, close_fds):
+    """Read one spawn request, fork, and reply with the child's pid. Returns only in the server."""
+    message, fds, _, _ = socket.recv_fds(conn, 65536, 3)
+    if not message and not fds: conn.close(); return # Readiness probe from the host
+    try:
+        request = json.loads(message.decode('utf-8'))
+        if len(fds) != 3: raise ValueError(f"expected 3 fds, got {len(fds)}")
+    except ValueError as e:
+        logger.error(f"Bad spawn request: {e}")
+        for fd in fds: os.close(fd)
+        conn.close(); return
+
+    sys.stdout.flush(); sys.stderr.flush() # Nothing buffered may be duplicated into the child
+    # The child must not keep the server end of any client connection open, or that client never sees EOF
+    # when the server is gone and its own child exits
+    child_close_fds = close_fds + [conn.fileno()] + [other.fileno() for other in children.values()]
+    pid = os.fork()
+    if pid == 0:
+        run_child(request, fds, child_close_fds)
+    for fd in fds: os.close(fd)
+    children[pid] = conn
+    logger.info(f"Forked PID {pid} for {request['script']}")
+    try: conn.sendall(json.dumps({'pid': pid}).encode('utf-8') + b'\n')
+    except OSError as e: logger.warning(f"Client for PID {pid} went away: {e}")
+
+
+def reap_children(children):
+    while True:
+        try: pid, status = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError: return
+        if pid == 0: return
+        exit_code = os.waitstatus_to_exitcode(status)
+        conn = children.pop(pid, None)
+        logger.info(f"PID {pid} exited with code {exit_code}")
+        if conn is None: continue
+        try: conn.sendall(json.dumps({'exit': exit_code}).encode('utf-8') + b'\n')
+        except OSError: pass # Host restarted meanwhile; nobody is waiting for this exit
+        finally: conn.close()
+
+
+def serve(socket_path):
+    if os.path.exists(socket_path): os.unlink(socket_path)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(socket_path)
+    os.chmod(socket_path, 0o600)
+    server.listen(64)
+
+    # SIGCHLD wakes the selector through a self-pipe, so the loop stays single-threaded (safe to fork)
+    wakeup_r, wakeup_w = os.pipe()
+    os.set_blocking(wakeup_r, False); os.set_blocking(wakeup_w, False)
+    signal.set_wakeup_fd(wakeup_w)
+    signal.signal(signal.SIGCHLD, lambda signum, frame: None)
+
+    selector = selectors.DefaultSelector()
+    selector.register(server, selectors.EVENT_READ, 'accept')
+    selector.register(wakeup_r, selectors.EVENT_READ, 'reap')
+    children = {} # {pid: client connection waiting for the exit code}
+    logger.info(f"Fork server ready on {socket_path} (PID {os.getpid()})")
+
+    while True:
+        for key, _ in selector.select():
+            if key.data == 'accept':
+                conn, _ = server.accept()
+                try: handle_request(conn, children, [server.fileno(), wakeup_r, wakeup_w, selector.fileno()])
+                except Exception as e:
+                    logger.error(f"Error handling spawn request: {e}", exc_info=True)
+                    conn.close()
+            else:
+                try:
+                    while os.read(wakeup_r, 512): pass
+                except BlockingIOError: pass
+                reap_children(children)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        print(f"Usage: {sys.argv[0]} <socket_path> [module,module,...]", file=sys.stderr)
+        sys.exit(2)
+    preload_modules([name for name in (sys.argv[2] if len(sys.argv) > 2 else '').split(',') if name])
+    serve(sys.argv[1])
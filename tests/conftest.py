@@ -0,0 +1,20 @@
+import os
+import sys
+import shutil
+import importlib
+
+import pytest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope='session')
+def bot(tmp_path_factory):
+    """bot.py imported from a copy in a temp dir: it creates its data folders and SQLite DB next to itself."""
+    work_dir = str(tmp_path_factory.mktemp('bot'))
+    for name in ('bot.py', 'forkserver.py'): shutil.copy(os.path.join(REPO_DIR, name), work_dir)
+    os.environ.pop('DATABASE_URL', None)
+    sys.path.insert(0, work_dir)
+    try: return importlib.import_module('bot')
+    finally: sys.path.remove(work_dir)
+
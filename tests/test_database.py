@@ -0,0 +1,79 @@
+from concurrent.futures import Future
+
+import pytest
+
+
+@pytest.fixture
+def store(bot, tmp_path):
+    store = bot.SQLiteStore(str(tmp_path / 'test.db'))
+    yield store
+    store.close()
+
+
+def applied_versions(store):
+    return store.read('SELECT version, applied_at FROM schema_version ORDER BY version')
+
+
+def table_names(store):
+    return {name for (name,) in store.read("SELECT name FROM sqlite_master WHERE type = 'table'")}
+
+
+def test_migrations_on_fresh_db(bot, store):
+    latest = bot.SCHEMA_MIGRATIONS[-1][0]
+    assert bot.run_schema_migrations(store) == latest
+    assert [version for version, _ in applied_versions(store)] == [version for version, _, _ in bot.SCHEMA_MIGRATIONS]
+    assert {'subscriptions', 'user_files', 'admins', 'script_runs', 'schema_version'} <= table_names(store)
+
+
+def test_migrations_run_again_do_nothing(bot, store):
+    bot.run_schema_migrations(store)
+    before = applied_versions(store)
+    assert bot.run_schema_migrations(store) == bot.SCHEMA_MIGRATIONS[-1][0]
+    assert applied_versions(store) == before
+
+
+def test_migrations_upgrade_v1_db(bot, store):
+    version, description, statements = bot.SCHEMA_MIGRATIONS[0]
+    types = bot.DIALECT_TYPES['sqlite']
+    store.write([[('CREATE TABLE schema_version (version INTEGER PRIMARY KEY, description TEXT, applied_at TEXT)', ())] +
+                 [(sql.format(**types), ()) for sql in statements] +
+                 [('INSERT INTO schema_version VALUES (?, ?, ?)', (version, description, '2024-01-01T00:00:00')),
+                  ('INSERT INTO user_files VALUES (?, ?, ?)', (5, 'a.py', 'py'))]])
+    assert 'script_runs' not in table_names(store)
+    assert bot.run_schema_migrations(store) == bot.SCHEMA_MIGRATIONS[-1][0]
+    assert 'script_runs' in table_names(store)
+    assert applied_versions(store)[0] == (1, '2024-01-01T00:00:00') # v1 not re-applied
+    assert store.read('SELECT user_id, file_name, file_type FROM user_files') == [(5, 'a.py', 'py')]
+
+
+def test_sqlalchemy_bind_rewrites_placeholders(bot):
+    pytest.importorskip('sqlalchemy')
+    store = bot.SQLAlchemyStore('sqlite://')
+    try:
+        statement, params = store._bind('SELECT ? + ?, ?', (1, 2, 'x'))
+        assert str(statement) == 'SELECT :p0 + :p1, :p2'
+        assert params == {'p0': 1, 'p1': 2, 'p2': 'x'}
+        assert store._bind('SELECT ? + ?, ?', (3, 4, 'y'))[0] is statement # Cached per SQL string
+        assert store.read('SELECT ? + ?, ?', (1, 2, 'x')) == [(3, 'x')]
+        assert store.write([[('CREATE TABLE t (k INTEGER PRIMARY KEY, v TEXT)', ())],
+                            [('INSERT INTO t VALUES (?, ?)', (1, 'a')), ('INSERT INTO t VALUES (?, ?)', (2, 'b'))]])[1] == 2
+        assert store.read('SELECT v FROM t WHERE k = ?', (2,)) == [('b',)]
+    finally: store.close()
+
+
+def test_commit_batch_supersedes_keyed_writes_only(bot, store, monkeypatch):
+    monkeypatch.setattr(bot, 'DB_STORE', store)
+    store.write([[('CREATE TABLE kv (k TEXT PRIMARY KEY, v INTEGER)', ()),
+                  ('CREATE TABLE events (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT)', ())]])
+    upsert = 'INSERT INTO kv (k, v) VALUES (?, ?) ON CONFLICT (k) DO UPDATE SET v = excluded.v'
+    event = 'INSERT INTO events (name) VALUES (?)'
+    writes = [([(upsert, ('a', 1))], ('kv', 'a')),
+              ([(event, ('first',))], None),
+              ([(upsert, ('b', 1))], ('kv', 'b')),
+              ([(event, ('second',))], None),
+              ([(upsert, ('a', 2))], ('kv', 'a'))]
+    batch = [(statements, "test write", Future(), key) for statements, key in writes]
+    bot._commit_db_batch(batch)
+    assert [future.result(1) for _, _, future, _ in batch] == [0, 1, 1, 1, 1] # Only the older ('kv', 'a') is dropped
+    assert store.read('SELECT k, v FROM kv ORDER BY k') == [('a', 2), ('b', 1)]
+    assert store.read('SELECT name FROM events ORDER BY id') == [('first',), ('second',)]
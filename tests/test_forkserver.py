@@ -0,0 +1,59 @@
+import os
+import sys
+import json
+import time
+import signal
+import socket
+import tempfile
+import unittest
+import subprocess
+
+FORKSERVER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'forkserver.py')
+
+
+class ForkServerTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.socket_path = os.path.join(self.tmp.name, 'fs.sock')
+        self.script = os.path.join(self.tmp.name, 'sleeper.py')
+        with open(self.script, 'w') as f: f.write('import time\ntime.sleep(60)\n')
+        self.server = subprocess.Popen([sys.executable, FORKSERVER, self.socket_path],
+                                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        deadline = time.time() + 10
+        while not os.path.exists(self.socket_path):
+            self.assertLess(time.time(), deadline, "fork server did not start")
+            time.sleep(0.05)
+        self.pids = []
+
+    def tearDown(self):
+        for pid in self.pids:
+            try: os.kill(pid, signal.SIGKILL)
+            except ProcessLookupError: pass
+        if self.server.poll() is None: self.server.kill()
+        self.server.wait()
+        self.tmp.cleanup()
+
+    def spawn(self):
+        """Send a spawn request like bot.forkserver_spawn; returns (connection, pid)."""
+        conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        conn.connect(self.socket_path)
+        with open(os.devnull, 'r+b') as devnull:
+            request = {'script': self.script, 'cwd': self.tmp.name, 'argv': [self.script]}
+            socket.send_fds(conn, [json.dumps(request).encode('utf-8') + b'\n'], [devnull.fileno()] * 3)
+        reply = conn.makefile('rb').readline()
+        pid = json.loads(reply)['pid']
+        self.pids.append(pid)
+        return conn, pid
+
+    def test_sibling_does_not_hold_client_connection(self):
+        conn1, pid1 = self.spawn()
+        conn2, pid2 = self.spawn() # Forked while conn1 was live
+        self.server.kill(); self.server.wait() # Like stop_forkserver(): children outlive the server
+        os.kill(pid1, signal.SIGKILL)
+        conn1.settimeout(5)
+        self.assertEqual(conn1.recv(1024), b'', "connection of the killed child did not reach EOF")
+        conn1.close(); conn2.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import re
+import time
+
+import pytest
+
+
+def test_parse_grep_query_options(bot):
+    regex, since, until, context = bot.parse_grep_query('-s 2h -u 30m -C 3 ERROR  boom')
+    assert regex.pattern == 'ERROR  boom' and context == 3
+    assert since == pytest.approx(time.time() - 7200, abs=5) and until == pytest.approx(time.time() - 1800, abs=5)
+    assert bot.parse_grep_query('-C 999 x')[3] == bot.GREP_MAX_CONTEXT
+    assert bot.parse_grep_query('x')[1:] == (None, None, bot.GREP_CONTEXT_LINES)
+
+
+def test_parse_grep_query_pattern_starting_with_dash(bot):
+    assert bot.parse_grep_query('-x')[0].pattern == '-x'
+    assert bot.parse_grep_query('-C 1 --verbose')[0].pattern == '--verbose'
+
+
+@pytest.mark.parametrize('query, message', [('-C x foo', '-C needs a number'), ('-s yesterday foo', "Bad time 'yesterday'"),
+                                            ('(', 'Invalid regex'), ('-s 1h', 'No pattern'), ('a' * 201, 'too long')])
+def test_parse_grep_query_errors(bot, query, message):
+    with pytest.raises(ValueError, match=re.escape(message)): bot.parse_grep_query(query)
+
+
+def test_parse_time_spec(bot):
+    assert bot.parse_time_spec('45s') == pytest.approx(time.time() - 45, abs=5)
+    assert bot.parse_time_spec('1D') == pytest.approx(time.time() - 86400, abs=5)
+    assert bot.parse_time_spec('2024-05-01T12:30') == time.mktime((2024, 5, 1, 12, 30, 0, 0, 0, -1))
+    with pytest.raises(ValueError): bot.parse_time_spec('5w')
+
+
+def test_grep_time_range_across_segments(bot, tmp_path, monkeypatch):
+    monkeypatch.setattr(bot, 'LOG_TIME_MARK_INTERVAL', 0.01)
+    log_path = str(tmp_path / 't.log')
+    writer = bot.RotatingScriptLog(log_path, 600, 20)
+    def write_phase(name):
+        for i in range(150):
+            writer.write(f"{name} {i} {'ERROR' if i % 50 == 0 else 'ok'}\n".encode())
+            if i % 25 == 0: time.sleep(0.02)
+    write_phase('early'); time.sleep(0.2)
+    middle = time.time(); time.sleep(0.2)
+    write_phase('late'); writer.close()
+    bot._log_compress_executor.submit(lambda: None).result()
+    assert len(bot.list_log_segments(log_path)) > 3 # Both phases span several segments
+
+    def matched(**window):
+        groups, matches, complete = bot.grep_script_log(log_path, re.compile('ERROR'), context=0, **window)
+        assert complete
+        return [text.split()[0] + text.split()[1] for group in groups for _, _, text, _ in group]
+    assert matched() == ['early0', 'early50', 'early100', 'late0', 'late50', 'late100']
+    assert matched(since=middle) == ['late0', 'late50', 'late100']
+    assert matched(until=middle) == ['early0', 'early50', 'early100']
+
+
+def test_grep_catastrophic_pattern_times_out(bot, tmp_path):
+    log_path = str(tmp_path / 'evil.log')
+    writer = bot.RotatingScriptLog(log_path, 10**6, 2)
+    for _ in range(3): writer.write(b'a' * 40 + b'!\n')
+    writer.close()
+    started = time.time()
+    groups, matches, complete = bot.grep_script_log(log_path, re.compile(r'(a+)+$'), timeout=1)
+    assert (groups, matches, complete) == ([], 0, False)
+    assert time.time() - started < 5 # Killed at the deadline, not left running
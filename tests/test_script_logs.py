@@ -0,0 +1,69 @@
+import re
+
+import pytest
+
+
+def write_lines(bot, log_path, count, segment_bytes=10**7, max_segments=10, width=0, start=0):
+    writer = bot.RotatingScriptLog(str(log_path), segment_bytes, max_segments)
+    for i in range(start, start + count): writer.write(f"line {i}{' ' + 'x' * width if width else ''}\n".encode())
+    writer.close()
+    bot._log_compress_executor.submit(lambda: None).result() # Rotated segments are gzipped by a single worker
+
+
+def page_position(text):
+    first, last, total = map(int, re.search(r'Lines (\d+)–(\d+) of (\d+)', text).groups())
+    return first - 1, last - 1, total # 0-based line numbers
+
+
+def buttons(markup):
+    return {button.text: button.callback_data for row in markup.keyboard for button in row}
+
+
+def test_line_index_matches_rescan(bot, tmp_path):
+    index = bot.LogLineIndex(stride=4)
+    data = b''.join(f"{i}\n".encode() for i in range(50)) + b'partial'
+    for chunk in (data[:7], data[7:8], data[8:100], data[100:]): index.record(chunk)
+    assert index.lines == 50 and index.partial
+    for line in (0, 3, 4, 17, 49):
+        offset, skip = index.locate(line)
+        assert data[offset:].split(b'\n')[skip] == str(line).encode()
+    segment = tmp_path / 'seg.log'; segment.write_bytes(data)
+    scanned = bot.load_segment_index(str(segment))
+    assert (scanned.lines, scanned.size, scanned.partial) == (index.lines, index.size, index.partial)
+
+
+def test_page_across_rotated_and_live_segment(bot, tmp_path):
+    log_path = tmp_path / 'a.log'
+    write_lines(bot, log_path, 500, segment_bytes=2000)
+    segments = bot.list_log_segments(str(log_path))
+    assert segments[0].endswith('.gz') and segments[-1] == str(log_path)
+    boundary = bot._log_segment_indexes(str(log_path))[-1][1].start_line # First line of the live segment
+    lines, first_line, first_available, total = bot.read_log_page(str(log_path), boundary - 5, page_lines=10)
+    assert (first_line, first_available, total) == (boundary - 5, 0, 500)
+    assert lines == [f"line {i}".encode() for i in range(boundary - 5, boundary + 5)]
+    lines, first_line, _, _ = bot.read_log_page(str(log_path), None, page_lines=10)
+    assert first_line == 490 and lines[-1] == b'line 499'
+
+
+def test_older_lines_rotated_out(bot, tmp_path):
+    log_path = tmp_path / 'b.log'
+    write_lines(bot, log_path, 500, segment_bytes=2000, max_segments=2)
+    lines, first_line, first_available, total = bot.read_log_page(str(log_path), 0, page_lines=10)
+    assert first_available > 0 and first_line == first_available
+    assert lines[0] == f"line {500 - (total - first_available)}".encode()
+    text, markup = bot.render_log_page(5, 'b.py', str(log_path), 0)
+    assert "(older lines rotated out)" in text
+    assert "⬅️ Older" not in buttons(markup)
+
+
+@pytest.mark.parametrize('start_line', [None, 100, 0])
+def test_long_page_trimming(bot, tmp_path, start_line):
+    log_path = tmp_path / f'c{start_line}.log'
+    write_lines(bot, log_path, 400, width=300)
+    text, markup = bot.render_log_page(5, 'c.py', str(log_path), start_line)
+    first, last, total = page_position(text)
+    assert last - first + 1 < bot.LOG_PAGE_LINES and len(text) <= 4096 # Trimmed to fit one message
+    if start_line is None: assert last == total - 1 # Newest page keeps its end
+    else:
+        assert first == start_line # A page opened at a line keeps its start
+        assert buttons(markup)["Newer ➡️"] == f"logp_5_{last + 1}_c.py"